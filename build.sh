@@ -92,7 +92,7 @@ check_prerequisites() {
     
     if [ "$BUILD_PYTHON" = true ]; then
         if ! command -v python3 &> /dev/null; then
-            log_error "Python3 not found. Install Python 3.9+"
+            log_error "Python3 not found. Install Python 3.10+"
             missing=$((missing + 1))
         else
             log_success "Python found: $(python3 --version)"
@@ -0,0 +1,92 @@
+"""
+Scalar scoring kernels used on every AI decision.
+
+Compiled with numba when it is installed so callers only pay the
+dispatch cost; otherwise the same functions run as plain Python.
+"""
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit
+except ImportError:
+    logger.info("numba not available, scoring kernels run as plain Python")
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True, fastmath=True)
+def optimal_boldness(trust_diff, round_progress, risk_tolerance):
+    """Optimal claim boldness for a trust position and game stage"""
+    # Behind: need to take more risks. Ahead: play safer
+    if trust_diff < -20.0:
+        position_modifier = 0.2
+    elif trust_diff > 20.0:
+        position_modifier = -0.2
+    else:
+        position_modifier = 0.0
+
+    # Endgame urgency
+    if round_progress > 0.75:
+        urgency_modifier = 0.15 * (round_progress - 0.75) * 4.0
+    else:
+        urgency_modifier = 0.0
+
+    optimal = risk_tolerance + position_modifier + urgency_modifier
+
+    # Clamp between 0.1 and 0.95
+    return max(0.1, min(0.95, optimal))
+
+
+@njit(cache=True, fastmath=True)
+def challenge_expected_value(bluff_prob):
+    """Expected trust change of challenging: +15 on success, -15 on failure"""
+    return bluff_prob * 15.0 + (1.0 - bluff_prob) * -15.0
+
+
+@njit(cache=True, fastmath=True)
+def estimate_outcome(success_prob, boldness):
+    """Expected trust change of a claim with the given boldness"""
+    potential_gain = 10.0 + boldness * 30.0
+    potential_loss = -(15.0 + boldness * 35.0)
+
+    return success_prob * potential_gain + (1.0 - success_prob) * potential_loss
+
+
+@njit(cache=True, fastmath=True)
+def adaptation_count(trust_change, boldness, is_claim):
+    """
+    Number of full 5-move windows that open with a loss and contain at
+    least two claims whose first and last boldness differ by > 0.2
+    """
+    adaptations = 0
+
+    for start in range(0, len(trust_change) // 5 * 5, 5):
+        claims = 0
+        first = 0.0
+        last = 0.0
+        for i in range(start, start + 5):
+            if is_claim[i]:
+                if claims == 0:
+                    first = boldness[i]
+                last = boldness[i]
+                claims += 1
+
+        if trust_change[start] < 0 and claims > 1 and abs(first - last) > 0.2:
+            adaptations += 1
+
+    return adaptations
+
+
+# Compile at import so the first request doesn't pay for it
+optimal_boldness(0.0, 0.5, 0.5)
+challenge_expected_value(0.5)
+estimate_outcome(0.5, 0.5)
+adaptation_count(np.zeros(5, dtype=np.float32), np.zeros(5, dtype=np.float64),
+                 np.zeros(5, dtype=np.bool_))
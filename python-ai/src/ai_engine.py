@@ -1,33 +1,93 @@
+import math
 import numpy as np
 import logging
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+import copy
+import functools
+import os
+from collections import OrderedDict, namedtuple
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple, Optional, Union
+from dataclasses import dataclass, field
+from enum import IntEnum
 import yaml
 
 from strategy_model import StrategyModel
 from bluff_detector import BluffDetector
 from pattern_analyzer import PatternAnalyzer
+from move_history import HistorySoA, Move, RollingTrustStats, normalize_moves
+import _fastmath
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@functools.lru_cache(maxsize=8)
+def _load_config_cached(config_path: str, mtime: float) -> Dict:
+    """Parse a YAML config file; cached per (path, mtime) so edits are picked up"""
+    with open(config_path, 'r') as f:
+        return yaml.safe_load(f)
+
+
+class Phase(IntEnum):
+    """Game phases the engine acts on; anything else is OTHER"""
+    OTHER = 0
+    CLAIM = 1
+    CHALLENGE = 2
+    
+    @classmethod
+    def parse(cls, phase: str) -> 'Phase':
+        """Map a phase name (any case) to a Phase"""
+        return _PHASES_BY_NAME.get(phase.upper(), cls.OTHER)
+
+
+_PHASES_BY_NAME = {'CLAIM': Phase.CLAIM, 'CHALLENGE': Phase.CHALLENGE}
+
+
+# Per-difficulty parameters, flattened from config for attribute access
+Difficulty = namedtuple('Difficulty', 'bluff challenge risk')
+
+
+# Claim fields that identify a claim for caching; other keys the
+# frontend sends (possibly nested) don't affect decisions
+_CLAIM_KEY_FIELDS = ('boldness', 'type', 'description')
+
+
+def _claim_key(claim: Optional[Mapping]) -> Optional[Tuple]:
+    """Hashable view of the claim fields decisions depend on"""
+    if claim is None:
+        return None
+    return tuple(claim.get(name) for name in _CLAIM_KEY_FIELDS)
+
+
+@dataclass(slots=True, frozen=True)
 class GameState:
-    """Represents the current game state"""
+    """Represents the current game state (immutable)"""
     round_number: int
-    phase: str
+    phase: Phase
     player1_trust: int
     player2_trust: int
-    current_claim: Optional[Dict] = None
-    move_history: List[Dict] = None
+    # Compared and hashed through claim_key; the arrays in history are
+    # derived from move_history
+    current_claim: Optional[Mapping] = field(default=None, compare=False)
+    move_history: Tuple[Move, ...] = field(default_factory=tuple)
+    history: Optional[HistorySoA] = field(default=None, compare=False, repr=False)
+    claim_key: Optional[Tuple] = field(init=False, repr=False)
     
     def __post_init__(self):
-        if self.move_history is None:
-            self.move_history = []
+        # Normalize caller-supplied values; frozen fields are set
+        # through object.__setattr__
+        if not isinstance(self.phase, Phase):
+            object.__setattr__(self, 'phase', Phase.parse(self.phase))
+        # Move records: normalized once here, hashable for cache keys
+        object.__setattr__(self, 'move_history', normalize_moves(self.move_history or ()))
+        if self.current_claim is not None and not isinstance(self.current_claim, MappingProxyType):
+            object.__setattr__(self, 'current_claim', MappingProxyType(dict(self.current_claim)))
+        object.__setattr__(self, 'claim_key', _claim_key(self.current_claim))
+        if self.history is None:
+            object.__setattr__(self, 'history', HistorySoA.from_moves(self.move_history))
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AIDecision:
     """Represents an AI decision"""
     action: str
@@ -37,18 +97,80 @@ class AIDecision:
     predicted_outcome: float = 0.0
 
 
+@dataclass
+class ClaimPlan:
+    """
+    Deterministic half of a claim decision, waiting on the model's
+    success probability. success_probability is already set when the
+    plan was served from the decision cache. features is the engine's
+    shared buffer, valid only until the next plan is made.
+    """
+    game_state: GameState
+    difficulty: Difficulty
+    cache_key: Tuple
+    optimal_boldness: float
+    features: Optional[np.ndarray] = None
+    success_probability: Optional[float] = None
+
+
 class AIEngine:
     """
     Core AI engine that makes strategic decisions using ML models
     and game theory principles.
     """
     
+    DECISION_CACHE_SIZE = 1024
+    
+    # With ai.early_accept on, claims whose boldness-only challenge EV is
+    # below this are accepted without running the full bluff detection
+    # and pattern analysis
+    EARLY_ACCEPT_EV = -10.0
+    
+    # Feature normalization factors (rounds per game, max trust, max history)
+    ROUND_SCALE = 1 / 20
+    TRUST_SCALE = 1 / 100
+    HISTORY_SCALE = 1 / 50
+    
+    CLAIM_TYPES = ('INFORMATION', 'PREDICTION', 'ACCUSATION', 'ALLIANCE')
+    
+    # Claim type weights per round bucket, in CLAIM_TYPES order
+    CLAIM_TYPE_WEIGHTS = (
+        (0.5, 0.3, 0.1, 0.1),  # Early game (rounds 1-5): information claims
+        (0.3, 0.3, 0.2, 0.2),  # Mid game (rounds 6-15): mix of types
+        (0.2, 0.3, 0.4, 0.1)   # Late game: aggressive claims
+    )
+    
+    CLAIM_TEMPLATES = {
+        'INFORMATION': [
+            "I have reliable intelligence about the situation",
+            "My sources confirm a significant development",
+            "I've discovered critical information that changes everything"
+        ],
+        'PREDICTION': [
+            "I predict the next phase will favor my position",
+            "Based on my analysis, I foresee a major shift",
+            "The patterns indicate an inevitable outcome"
+        ],
+        'ACCUSATION': [
+            "Your previous claim was clearly fabricated",
+            "I can prove your last statement was false",
+            "The evidence contradicts your position"
+        ],
+        'ALLIANCE': [
+            "I propose we collaborate on this matter",
+            "Our interests align in this situation",
+            "A strategic partnership would benefit us both"
+        ]
+    }
+    
+    # Suffixes by boldness bucket: low, medium (> 0.4), high (> 0.7)
+    INTENSITY_SUFFIXES = ("", " with strong confidence", " with absolute certainty")
+    
     def __init__(self, config_path: str = "config.yaml"):
         self.config = self._load_config(config_path)
         
         self.strategy_model = StrategyModel(
-            model_path=self.config['ai']['model_path'],
-            scaler_path=self.config['ai']['scaler_path']
+            model_path=self.config['ai']['model_path']
         )
         
         self.bluff_detector = BluffDetector()
@@ -56,14 +178,41 @@ class AIEngine:
         
         self.difficulty_params = self.config['ai']['difficulty_levels']
         self.current_difficulty = 'medium'
+        self._diff = self._difficulty_tuple(self.current_difficulty)
+        
+        # Single generator for all sampling; seed it for reproducible play
+        self._rng = np.random.default_rng(self.config['ai'].get('seed'))
+        self._claim_cdf = self._build_claim_cdf()
+        self._claim_type_index = {t: i for i, t in enumerate(self.CLAIM_TYPES)}
+        self._claim_strings = self._build_claim_strings()
+        
+        # Optional session state for embedding the engine directly (the
+        # HTTP server never reports outcomes): momentum/volatility from
+        # outcomes fed to update_from_result instead of the history sent
+        # with each request. One window per engine, so one engine per game
+        self._recent = (RollingTrustStats()
+                        if self.config['ai'].get('session_stats') else None)
+        
+        # Opt-in approximation: skips the detectors for low-boldness claims,
+        # which can turn challenges the full analysis would make into accepts
+        self._early_accept = bool(self.config['ai'].get('early_accept'))
+        
+        # Reused for every feature vector to avoid per-decision allocation.
+        # float64 so heuristic outputs aren't rounded; the model casts
+        # to float32 itself where it needs to
+        self._feat_buf = np.empty((1, 7), dtype=np.float64)
+        
+        # LRU of deterministic decision work, keyed on a game-state digest
+        self._decision_cache: OrderedDict = OrderedDict()
         
         logger.info("AI Engine initialized successfully")
     
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration from YAML file"""
         try:
-            with open(config_path, 'r') as f:
-                return yaml.safe_load(f)
+            mtime = os.stat(config_path).st_mtime
+            # Hand out a private copy so callers can't mutate the cached dict
+            return copy.deepcopy(_load_config_cached(config_path, mtime))
         except FileNotFoundError:
             logger.warning(f"Config file {config_path} not found, using defaults")
             return self._default_config()
@@ -73,7 +222,6 @@ class AIEngine:
         return {
             'ai': {
                 'model_path': 'models/trained_model.pkl',
-                'scaler_path': 'models/scaler.pkl',
                 'difficulty_levels': {
                     'medium': {
                         'bluff_threshold': 0.5,
@@ -84,24 +232,96 @@ class AIEngine:
             }
         }
     
+    def _difficulty_tuple(self, difficulty: str) -> Difficulty:
+        """Flatten a difficulty level's config into a Difficulty tuple"""
+        params = self.difficulty_params[difficulty]
+        return Difficulty(
+            params['bluff_threshold'],
+            params['challenge_threshold'],
+            params['risk_tolerance']
+        )
+    
     def set_difficulty(self, difficulty: str):
         """Set AI difficulty level"""
         if difficulty in self.difficulty_params:
             self.current_difficulty = difficulty
-            logger.info(f"AI difficulty set to: {difficulty}")
+            self._diff = self._difficulty_tuple(difficulty)
+            logger.info("AI difficulty set to: %s", difficulty)
         else:
-            logger.warning(f"Unknown difficulty: {difficulty}")
+            logger.warning("Unknown difficulty: %s", difficulty)
+    
+    def _state_key(self, game_state: GameState) -> Tuple:
+        """Build the decision cache key for a game state"""
+        # The full history is digested: reputation and pattern analysis
+        # look past the recent window, so a tail-only key could collide
+        return (
+            self.current_difficulty,
+            self.bluff_detector.weights_version,
+            game_state.round_number,
+            game_state.phase,
+            game_state.player1_trust,
+            game_state.player2_trust,
+            game_state.claim_key,
+            game_state.move_history,
+            self._recent.key() if self._recent is not None else None
+        )
+    
+    def _cache_get(self, key: Tuple):
+        """Return cached value for key (marking it recently used), or None"""
+        cache = self._decision_cache
+        try:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+        except TypeError:
+            # Unhashable claim field values: the state is never cached
+            pass
+        return None
+    
+    def _cache_put(self, key: Tuple, value):
+        """Store value, evicting the least recently used entry when full"""
+        cache = self._decision_cache
+        try:
+            cache[key] = value
+        except TypeError:
+            return
+        if len(cache) > self.DECISION_CACHE_SIZE:
+            cache.popitem(last=False)
+    
+    def _cached(self, key: Tuple, compute):
+        """Return cached value for key, computing and storing it on a miss"""
+        value = self._cache_get(key)
+        if value is None:
+            value = compute()
+            self._cache_put(key, value)
+        return value
     
     def make_decision(self, game_state: GameState, player_type: str) -> AIDecision:
         """
         Main decision-making function. Analyzes game state and returns
         optimal action based on ML predictions and strategic analysis.
         """
-        phase = game_state.phase.upper()
+        plan = self.plan_decision(game_state)
+        
+        if isinstance(plan, ClaimPlan):
+            success_probability = plan.success_probability
+            if success_probability is None:
+                success_probability = self.strategy_model.predict_success(plan.features)
+            return self.complete_claim(plan, success_probability)
+        
+        return plan
+    
+    def plan_decision(self, game_state: GameState) -> Union[AIDecision, ClaimPlan]:
+        """
+        First stage of a decision. Challenge and idle phases are decided
+        outright; claims return a ClaimPlan whose success probability the
+        caller supplies to complete_claim, so model calls can be batched.
+        """
+        phase = game_state.phase
         
-        if phase == "CLAIM":
-            return self._make_claim_decision(game_state)
-        elif phase == "CHALLENGE":
+        if phase is Phase.CLAIM:
+            return self._plan_claim(game_state)
+        elif phase is Phase.CHALLENGE:
             return self._make_challenge_decision(game_state)
         else:
             return AIDecision(
@@ -110,14 +330,22 @@ class AIEngine:
                 reasoning="Waiting for resolution phase to complete"
             )
     
-    def _make_claim_decision(self, game_state: GameState) -> AIDecision:
+    def _plan_claim(self, game_state: GameState) -> ClaimPlan:
         """
-        Decide what claim to make. Uses ML model to predict success
-        probability and strategic analysis for claim crafting.
+        Compute the deterministic part of a claim: optimal boldness and
+        the model features. Boldness and success probability are cached
+        per state; the bluff/claim sampling in complete_claim is not.
         """
-        difficulty = self.difficulty_params[self.current_difficulty]
+        difficulty = self._diff
+        cache_key = ('CLAIM',) + self._state_key(game_state)
+        
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            optimal_boldness, success_probability = cached
+            return ClaimPlan(game_state, difficulty, cache_key,
+                             optimal_boldness,
+                             success_probability=success_probability)
         
-        # Analyze current situation
         trust_differential = game_state.player2_trust - game_state.player1_trust
         round_progress = game_state.round_number / 20.0
         
@@ -125,13 +353,34 @@ class AIEngine:
         optimal_boldness = self._calculate_optimal_boldness(
             trust_differential, 
             round_progress,
-            difficulty['risk_tolerance']
+            difficulty.risk
         )
         
+        features = self._extract_features(game_state, optimal_boldness)
+        
+        return ClaimPlan(game_state, difficulty, cache_key,
+                         optimal_boldness, features=features)
+    
+    def complete_claim(self, plan: ClaimPlan,
+                       success_probability: float) -> AIDecision:
+        """
+        Decide what claim to make given the predicted success probability
+        of the planned boldness, and craft the claim.
+        """
+        game_state = plan.game_state
+        difficulty = plan.difficulty
+        optimal_boldness = plan.optimal_boldness
+        
+        if plan.success_probability is None:
+            self._cache_put(plan.cache_key, (optimal_boldness, success_probability))
+        
+        # Analyze current situation
+        trust_differential = game_state.player2_trust - game_state.player1_trust
+        
         # Decide whether to bluff
         should_bluff = self._should_bluff(
             game_state,
-            difficulty['bluff_threshold']
+            difficulty.bluff
         )
         
         # Select claim type based on strategy
@@ -147,10 +396,6 @@ class AIEngine:
             should_bluff
         )
         
-        # Predict success probability
-        features = self._extract_features(game_state, optimal_boldness)
-        success_probability = self.strategy_model.predict_success(features)
-        
         claim_data = {
             'description': claim_description,
             'type': claim_type,
@@ -176,8 +421,16 @@ class AIEngine:
     def _make_challenge_decision(self, game_state: GameState) -> AIDecision:
         """
         Decide whether to challenge opponent's claim or accept it.
-        Uses bluff detection and risk assessment.
+        Uses bluff detection and risk assessment. The decision is fully
+        deterministic in the game state, so it is served from the cache.
         """
+        return self._cached(
+            ('CHALLENGE',) + self._state_key(game_state),
+            lambda: self._evaluate_challenge(game_state)
+        )
+    
+    def _evaluate_challenge(self, game_state: GameState) -> AIDecision:
+        """Run bluff detection and risk assessment for a challenge decision"""
         if game_state.current_claim is None:
             return AIDecision(
                 action="ACCEPT",
@@ -185,17 +438,34 @@ class AIEngine:
                 reasoning="No claim to evaluate"
             )
         
-        difficulty = self.difficulty_params[self.current_difficulty]
+        if self._early_accept:
+            # Cheap pre-filter: boldness alone as a bluff probability proxy.
+            # Obvious accepts skip the detectors entirely
+            boldness_suspicion = self.bluff_detector._analyze_boldness(game_state.current_claim)
+            cheap_ev = self._calculate_challenge_expected_value(
+                boldness_suspicion,
+                game_state.current_claim['boldness']
+            )
+            
+            if cheap_ev < self.EARLY_ACCEPT_EV:
+                return AIDecision(
+                    action="ACCEPT",
+                    confidence=1.0 - boldness_suspicion,
+                    reasoning=self._generate_challenge_reasoning(
+                        boldness_suspicion, cheap_ev, {}, False
+                    ),
+                    predicted_outcome=cheap_ev
+                )
         
         # Analyze claim for bluff indicators
         bluff_probability = self.bluff_detector.detect_bluff(
             game_state.current_claim,
-            game_state.move_history
+            game_state.history
         )
         
         # Analyze opponent's pattern
         opponent_pattern = self.pattern_analyzer.analyze_player_pattern(
-            game_state.move_history
+            game_state.history
         )
         
         # Calculate expected value of challenging
@@ -205,7 +475,7 @@ class AIEngine:
         )
         
         # Decision threshold adjusted by difficulty
-        challenge_threshold = difficulty['challenge_threshold']
+        challenge_threshold = self._diff.challenge
         
         should_challenge = bluff_probability > challenge_threshold or challenge_ev > 0
         
@@ -232,29 +502,9 @@ class AIEngine:
         Calculate optimal claim boldness based on game situation.
         Uses strategic principles and risk tolerance.
         """
-        # Base boldness on risk tolerance
-        base_boldness = risk_tolerance
-        
-        # Adjust based on trust position
-        if trust_diff < -20:
-            # Behind: need to take more risks
-            position_modifier = 0.2
-        elif trust_diff > 20:
-            # Ahead: play safer
-            position_modifier = -0.2
-        else:
-            position_modifier = 0.0
-        
-        # Adjust based on round (endgame urgency)
-        if round_progress > 0.75:
-            urgency_modifier = 0.15 * (round_progress - 0.75) * 4
-        else:
-            urgency_modifier = 0.0
-        
-        optimal = base_boldness + position_modifier + urgency_modifier
-        
-        # Clamp between 0.1 and 0.95
-        return max(0.1, min(0.95, optimal))
+        return _fastmath.optimal_boldness(
+            float(trust_diff), float(round_progress), float(risk_tolerance)
+        )
     
     def _should_bluff(self, game_state: GameState, threshold: float) -> bool:
         """
@@ -264,140 +514,126 @@ class AIEngine:
         trust_factor = game_state.player2_trust / 100.0
         
         # Analyze recent success rate
-        recent_moves = game_state.move_history[-10:] if game_state.move_history else []
-        success_rate = sum(1 for m in recent_moves if m.get('success', False)) / max(len(recent_moves), 1)
+        recent_success = game_state.history.success[-10:]
+        success_rate = float(recent_success.mean()) if len(recent_success) else 0.0
         
         # Random element for unpredictability
-        randomness = np.random.random() * 0.3
+        randomness = self._rng.random() * 0.3
         
         bluff_score = (trust_factor * 0.4) + (success_rate * 0.4) + randomness
         
         return bluff_score > threshold
     
+    def _build_claim_cdf(self) -> np.ndarray:
+        """
+        Precompute normalized claim-type CDFs, one row per
+        (round bucket << 1) | is_bluff.
+        """
+        cdf = np.empty((2 * len(self.CLAIM_TYPE_WEIGHTS), len(self.CLAIM_TYPES)),
+                       dtype=np.float64)
+        
+        for r_idx, base_weights in enumerate(self.CLAIM_TYPE_WEIGHTS):
+            for is_bluff in (False, True):
+                weights = np.array(base_weights, dtype=np.float64)
+                
+                if is_bluff:
+                    # Bluffs work better with certain types
+                    weights[0] *= 1.5  # Information bluffs are harder to verify
+                    weights[2] *= 0.5  # Accusations are easier to disprove
+                
+                row = np.cumsum(weights / weights.sum())
+                row[-1] = 1.0  # Guard against rounding leaving a gap at the top
+                cdf[(r_idx << 1) | is_bluff] = row
+        
+        return cdf
+    
     def _select_claim_type(self, game_state: GameState, is_bluff: bool) -> str:
         """Select appropriate claim type based on strategy"""
         round_num = game_state.round_number
+        r_idx = 0 if round_num <= 5 else 1 if round_num <= 15 else 2
         
-        # Strategic claim type selection
-        if round_num <= 5:
-            # Early game: information claims
-            weights = [0.5, 0.3, 0.1, 0.1]
-        elif round_num <= 15:
-            # Mid game: mix of types
-            weights = [0.3, 0.3, 0.2, 0.2]
-        else:
-            # Late game: aggressive claims
-            weights = [0.2, 0.3, 0.4, 0.1]
+        cdf = self._claim_cdf[(r_idx << 1) | int(is_bluff)]
         
-        types = ['INFORMATION', 'PREDICTION', 'ACCUSATION', 'ALLIANCE']
-        
-        if is_bluff:
-            # Bluffs work better with certain types
-            weights[0] *= 1.5  # Information bluffs are harder to verify
-            weights[2] *= 0.5  # Accusations are easier to disprove
-        
-        # Normalize weights
-        total = sum(weights)
-        weights = [w / total for w in weights]
-        
-        return np.random.choice(types, p=weights)
+        return self.CLAIM_TYPES[cdf.searchsorted(self._rng.random(), side='right')]
+    
+    def _build_claim_strings(self) -> List[List[str]]:
+        """
+        Materialize every template/intensity combination per claim type,
+        indexed [type][bucket * n_templates + variant].
+        """
+        return [
+            [template + suffix
+             for suffix in self.INTENSITY_SUFFIXES
+             for template in self.CLAIM_TEMPLATES[claim_type]]
+            for claim_type in self.CLAIM_TYPES
+        ]
     
     def _generate_claim_description(self, claim_type: str, 
                                     boldness: float, 
                                     is_bluff: bool) -> str:
         """Generate natural language claim description"""
+        # Unknown types fall back to INFORMATION (index 0)
+        type_idx = self._claim_type_index.get(claim_type, 0)
+        strings = self._claim_strings[type_idx]
+        n_variants = len(strings) // len(self.INTENSITY_SUFFIXES)
         
-        templates = {
-            'INFORMATION': [
-                f"I have reliable intelligence about the situation",
-                f"My sources confirm a significant development",
-                f"I've discovered critical information that changes everything"
-            ],
-            'PREDICTION': [
-                f"I predict the next phase will favor my position",
-                f"Based on my analysis, I foresee a major shift",
-                f"The patterns indicate an inevitable outcome"
-            ],
-            'ACCUSATION': [
-                f"Your previous claim was clearly fabricated",
-                f"I can prove your last statement was false",
-                f"The evidence contradicts your position"
-            ],
-            'ALLIANCE': [
-                f"I propose we collaborate on this matter",
-                f"Our interests align in this situation",
-                f"A strategic partnership would benefit us both"
-            ]
-        }
-        
-        base_claim = np.random.choice(templates.get(claim_type, templates['INFORMATION']))
+        # Intensity based on boldness
+        bucket = 2 if boldness > 0.7 else 1 if boldness > 0.4 else 0
         
-        # Add intensity based on boldness
-        if boldness > 0.7:
-            intensity = " with absolute certainty"
-        elif boldness > 0.4:
-            intensity = " with strong confidence"
-        else:
-            intensity = ""
-        
-        return base_claim + intensity
+        return strings[bucket * n_variants + self._rng.integers(n_variants)]
     
     def _extract_features(self, game_state: GameState, boldness: float) -> np.ndarray:
-        """Extract feature vector for ML model"""
-        features = [
-            game_state.round_number / 20.0,
-            game_state.player2_trust / 100.0,
-            game_state.player1_trust / 100.0,
-            boldness,
-            len(game_state.move_history) / 50.0,
-            self._calculate_momentum(game_state.move_history),
-            self._calculate_volatility(game_state.move_history)
-        ]
+        """
+        Extract feature vector for ML model. The returned array is the
+        engine's reusable buffer and is overwritten by the next call:
+        consume it immediately or copy it.
+        """
+        features = self._feat_buf
+        history = game_state.history
+        
+        features[0, 0] = game_state.round_number * self.ROUND_SCALE
+        features[0, 1] = game_state.player2_trust * self.TRUST_SCALE
+        features[0, 2] = game_state.player1_trust * self.TRUST_SCALE
+        features[0, 3] = boldness
+        features[0, 4] = len(history) * self.HISTORY_SCALE
+        
+        if self._recent is not None:
+            features[0, 5] = self._recent.momentum()
+            features[0, 6] = self._recent.volatility()
+        else:
+            features[0, 5] = self._calculate_momentum(history)
+            features[0, 6] = self._calculate_volatility(history)
         
-        return np.array(features).reshape(1, -1)
+        return features
     
-    def _calculate_momentum(self, move_history: List[Dict]) -> float:
+    def _calculate_momentum(self, history: HistorySoA) -> float:
         """Calculate recent performance momentum"""
-        if not move_history:
-            return 0.5
-        
-        recent = move_history[-5:]
-        trust_changes = [m.get('trust_change', 0) for m in recent]
-        
-        if not trust_changes:
+        if not len(history):
             return 0.5
         
-        avg_change = np.mean(trust_changes)
+        # At most 5 values: plain Python beats NumPy's per-call overhead
+        recent = history.trust_change[-5:].tolist()
+        avg_change = math.fsum(recent) / len(recent)
         return 0.5 + (avg_change / 50.0)  # Normalize to 0-1
     
-    def _calculate_volatility(self, move_history: List[Dict]) -> float:
+    def _calculate_volatility(self, history: HistorySoA) -> float:
         """Calculate strategy volatility"""
-        if len(move_history) < 3:
+        if len(history) < 3:
             return 0.5
         
-        trust_changes = [m.get('trust_change', 0) for m in move_history[-10:]]
-        return min(1.0, np.std(trust_changes) / 20.0)
+        recent = history.trust_change[-10:].tolist()
+        mean = math.fsum(recent) / len(recent)
+        std = math.sqrt(math.fsum((x - mean) * (x - mean) for x in recent) / len(recent))
+        return min(1.0, std / 20.0)
     
     def _calculate_challenge_expected_value(self, bluff_prob: float, 
                                            boldness: float) -> float:
         """Calculate expected value of challenging"""
-        # Points gained if challenge succeeds
-        success_gain = 15
-        
-        # Points lost if challenge fails
-        failure_loss = -15
-        
-        # Expected value calculation
-        ev = (bluff_prob * success_gain) + ((1 - bluff_prob) * failure_loss)
-        
-        return ev
+        return _fastmath.challenge_expected_value(float(bluff_prob))
     
     def _estimate_outcome(self, success_prob: float, boldness: float) -> float:
         """Estimate expected outcome of a claim"""
-        potential_gain = 10 + (boldness * 30)
-        potential_loss = -(15 + (boldness * 35))
-        
-        return (success_prob * potential_gain) + ((1 - success_prob) * potential_loss)
+        return _fastmath.estimate_outcome(float(success_prob), float(boldness))
     
     def _generate_claim_reasoning(self, is_bluff: bool, boldness: float,
                                   success_prob: float, trust_diff: int) -> str:
@@ -451,15 +687,22 @@ class AIEngine:
         # Update pattern analyzer
         self.pattern_analyzer.update_patterns(actual_outcome)
         
-        logger.debug(f"Updated models with outcome: {actual_outcome}")
+        if self._recent is not None:
+            self._recent.push(actual_outcome.get('trust_change', 0))
+        
+        logger.debug("Updated models with outcome: %s", actual_outcome)
     
     def _log_training_data(self, game_state: GameState,
                            decision: AIDecision,
                            outcome: Dict):
         """Log data for future model training"""
+        # Entries only go to the debug log for now; skip building them otherwise
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        
         training_entry = {
             'round': game_state.round_number,
-            'phase': game_state.phase,
+            'phase': game_state.phase.name,
             'action': decision.action,
             'confidence': decision.confidence,
             'boldness': decision.claim_data.get('boldness', 0) if decision.claim_data else 0,
@@ -468,4 +711,4 @@ class AIEngine:
         }
         
         # In production, write to database or file
-        logger.debug(f"Training data logged: {training_entry}")
\ No newline at end of file
+        logger.debug("Training data logged: %s", training_entry)
\ No newline at end of file
@@ -1,104 +1,186 @@
-from flask import Flask, request, jsonify
+from contextlib import asynccontextmanager
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+import uvicorn
 import logging
+import msgspec
+import orjson
 import yaml
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Union
 
-from ai_engine import AIEngine, GameState, AIDecision
+from ai_engine import AIEngine, GameState, AIDecision, ClaimPlan, Phase
+from prediction_batcher import PredictionBatcher
 
-app = Flask(__name__)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize AI Engine
+# Initialize AI Engine. Under gunicorn --preload this runs once in the
+# master and workers share the loaded models copy-on-write:
+#   gunicorn -w 4 -k uvicorn.workers.UvicornWorker --preload --pythonpath src \
+#       -b 0.0.0.0:5000 api_server:app
 ai_engine = AIEngine()
 
-@app.route('/health', methods=['GET'])
-def health_check():
+# Coalesces claim success predictions from concurrent requests
+batcher = PredictionBatcher(ai_engine.strategy_model)
+
+
+class GameStateMsg(msgspec.Struct):
+    """Wire schema of a game state, with the frontend's defaults"""
+    # Numbers may be fractional, as the baseline JSON parsing allowed
+    round: Union[int, float] = 1
+    phase: str = 'CLAIM'
+    player1_trust: Union[int, float] = 50
+    player2_trust: Union[int, float] = 50
+    current_claim: Optional[Dict[str, Any]] = None
+    move_history: Optional[List[Dict[str, Any]]] = None
+
+
+class DecideRequest(msgspec.Struct):
+    """Wire schema of an /ai/decide request body"""
+    game_state: GameStateMsg
+    player_type: str = 'AI_MEDIUM'
+
+
+# Compiled once; decodes and validates bodies straight from bytes.
+# Non-strict so numeric strings and whole floats still coerce to int
+decide_decoder = msgspec.json.Decoder(DecideRequest, strict=False)
+
+
+def json_response(payload: Dict[str, Any], status: int = 200) -> Response:
+    """Serialize payload with orjson into a JSON response"""
+    return Response(
+        orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+        status_code=status,
+        media_type='application/json'
+    )
+
+
+async def parse_json_body(request: Request) -> Any:
+    """Parse the raw request body with orjson; None if empty or invalid"""
+    try:
+        return orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        return None
+
+
+async def health_check(request: Request) -> Response:
     """Health check endpoint"""
-    return jsonify({'status': 'ok', 'service': 'Strategic Mind AI Engine'}), 200
+    return json_response({'status': 'ok', 'service': 'Strategic Mind AI Engine'})
 
-@app.route('/ai/decide', methods=['POST'])
-def ai_decide():
+async def ai_decide(request: Request) -> Response:
     """
     Main AI decision endpoint.
     Receives game state and returns optimal move.
     """
     try:
-        data = request.get_json()
-        
-        if not data or 'game_state' not in data:
-            return jsonify({'error': 'Missing game_state'}), 400
+        try:
+            decide_request = decide_decoder.decode(await request.body())
+        except msgspec.DecodeError as e:
+            return json_response({'error': f'Invalid request: {e}'}, 400)
         
         # Parse game state
-        game_state_dict = data['game_state']
-        game_state = parse_game_state(game_state_dict)
+        game_state = game_state_from_msg(decide_request.game_state)
         
         # Get player type for difficulty
-        player_type = data.get('player_type', 'AI_MEDIUM')
-        difficulty = extract_difficulty(player_type)
+        difficulty = extract_difficulty(decide_request.player_type)
         ai_engine.set_difficulty(difficulty)
         
-        # Make decision
-        decision = ai_engine.make_decision(game_state, player_type)
+        # Make decision; claim success probabilities go through the batcher
+        plan = ai_engine.plan_decision(game_state)
+        
+        if isinstance(plan, ClaimPlan):
+            success_probability = plan.success_probability
+            if success_probability is None:
+                success_probability = await batcher.predict(plan.features)
+            decision = ai_engine.complete_claim(plan, success_probability)
+        else:
+            decision = plan
         
         # Convert to response format
         response = serialize_decision(decision)
         
-        logger.info(f"AI Decision: {decision.action} (confidence: {decision.confidence:.2f})")
+        logger.info("AI Decision: %s (confidence: %.2f)", decision.action, decision.confidence)
         
-        return jsonify(response), 200
+        return json_response(response)
         
     except Exception as e:
         logger.error(f"Error in ai_decide: {str(e)}", exc_info=True)
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
-@app.route('/ai/set_difficulty', methods=['POST'])
-def set_difficulty():
+async def set_difficulty(request: Request) -> Response:
     """Set AI difficulty level"""
     try:
-        data = request.get_json()
+        data = await parse_json_body(request)
         difficulty = data.get('difficulty', 'medium')
         
         ai_engine.set_difficulty(difficulty)
         
-        return jsonify({'status': 'ok', 'difficulty': difficulty}), 200
+        return json_response({'status': 'ok', 'difficulty': difficulty})
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
-@app.route('/ai/analyze', methods=['POST'])
-def analyze_state():
+async def analyze_state(request: Request) -> Response:
     """Analyze game state and return strategic insights"""
     try:
-        data = request.get_json()
+        data = await parse_json_body(request)
         game_state_dict = data['game_state']
         game_state = parse_game_state(game_state_dict)
         
         analysis = {
             'trust_differential': game_state.player2_trust - game_state.player1_trust,
             'round_progress': game_state.round_number / 20.0,
-            'phase': game_state.phase,
+            'phase': game_state_dict.get('phase', 'CLAIM'),
             'recommendation': 'aggressive' if game_state.player2_trust < game_state.player1_trust else 'defensive'
         }
         
-        return jsonify(analysis), 200
+        return json_response(analysis)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 def parse_game_state(state_dict: Dict[str, Any]) -> GameState:
     """Parse game state from dictionary"""
+    current_claim = state_dict.get('current_claim')
+    
     return GameState(
         round_number=state_dict.get('round', 1),
-        phase=state_dict.get('phase', 'CLAIM'),
+        phase=Phase.parse(state_dict.get('phase', 'CLAIM')),
         player1_trust=state_dict.get('player1_trust', 50),
         player2_trust=state_dict.get('player2_trust', 50),
-        current_claim=state_dict.get('current_claim'),
-        move_history=state_dict.get('move_history', [])
+        current_claim=MappingProxyType(current_claim) if current_claim is not None else None,
+        move_history=tuple(state_dict.get('move_history') or ())
     )
 
+def game_state_from_msg(msg: GameStateMsg) -> GameState:
+    """Build a GameState from a decoded wire message"""
+    return GameState(
+        round_number=msg.round,
+        phase=Phase.parse(msg.phase),
+        player1_trust=msg.player1_trust,
+        player2_trust=msg.player2_trust,
+        current_claim=MappingProxyType(msg.current_claim) if msg.current_claim is not None else None,
+        move_history=tuple(msg.move_history or ())
+    )
+
+# Difficulty for the frontend's AI player types, keyed without the AI_ prefix
+_DIFFICULTY_BY_PLAYER_TYPE = {
+    'EASY': 'easy',
+    'MEDIUM': 'medium',
+    'HARD': 'hard',
+    'RUTHLESS': 'ruthless'
+}
+
 def extract_difficulty(player_type: str) -> str:
     """Extract difficulty from player type string"""
     player_type_upper = player_type.upper()
     
+    difficulty = _DIFFICULTY_BY_PLAYER_TYPE.get(player_type_upper.removeprefix('AI_'))
+    if difficulty is not None:
+        return difficulty
+    
+    # Unrecognized format: fall back to scanning for a level name
     if 'EASY' in player_type_upper:
         return 'easy'
     elif 'HARD' in player_type_upper:
@@ -122,7 +204,24 @@ def serialize_decision(decision: AIDecision) -> Dict[str, Any]:
     
     return response
 
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    """Run the prediction batcher for the lifetime of the server"""
+    await batcher.start()
+    yield
+    await batcher.stop()
+
+app = Starlette(
+    routes=[
+        Route('/health', health_check, methods=['GET']),
+        Route('/ai/decide', ai_decide, methods=['POST']),
+        Route('/ai/set_difficulty', set_difficulty, methods=['POST']),
+        Route('/ai/analyze', analyze_state, methods=['POST'])
+    ],
+    lifespan=lifespan
+)
+
 if __name__ == '__main__':
     port = 5000
     logger.info(f"Starting AI Engine API Server on port {port}")
-    app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
+    uvicorn.run(app, host='0.0.0.0', port=port)
\ No newline at end of file
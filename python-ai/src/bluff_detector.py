@@ -1,7 +1,10 @@
+import math
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple, Union
 import logging
 
+from move_history import HistorySoA
+
 logger = logging.getLogger(__name__)
 
 
@@ -11,6 +14,10 @@ class BluffDetector:
     Uses pattern recognition and statistical analysis.
     """
     
+    # Order of indicator scores/weights in the weight vector
+    INDICATOR_ORDER = ('high_boldness', 'inconsistency',
+                       'timing_suspicious', 'reputation_factor')
+    
     def __init__(self):
         self.bluff_indicators = {
             'high_boldness': 0.25,
@@ -18,41 +25,77 @@ class BluffDetector:
             'timing_suspicious': 0.15,
             'reputation_factor': 0.30
         }
+        self._w = self._weight_vector()
+        # Bumped on every weight change; part of the engine's cache key
+        self.weights_version = 0
+    
+    def _weight_vector(self) -> np.ndarray:
+        """Indicator weights as a vector in INDICATOR_ORDER"""
+        return np.array([self.bluff_indicators[name] for name in self.INDICATOR_ORDER],
+                        dtype=np.float64)
     
-    def detect_bluff(self, claim: Dict, move_history: List[Dict]) -> float:
+    def detect_bluff(self, claim: Dict,
+                     move_history: Union[HistorySoA, List[Dict]]) -> float:
         """
         Analyze a claim and return probability that it's a bluff (0-1).
         
         Args:
             claim: Current claim data
-            move_history: Historical moves from the game
+            move_history: Historical moves from the game, either as a
+                list of move dicts or an already-converted HistorySoA
             
         Returns:
             Float between 0 and 1 representing bluff probability
         """
-        scores = []
+        if not isinstance(move_history, HistorySoA):
+            move_history = HistorySoA.from_moves(move_history)
         
-        # Indicator 1: Boldness analysis
-        boldness_score = self._analyze_boldness(claim)
-        scores.append(boldness_score * self.bluff_indicators['high_boldness'])
+        recent_claim_boldness, recent_trust_change, challenge_success_rate = \
+            self._extract_stats(move_history)
         
-        # Indicator 2: Consistency with history
-        consistency_score = self._analyze_consistency(claim, move_history)
-        scores.append(consistency_score * self.bluff_indicators['inconsistency'])
+        scores = np.array([
+            # Indicator 1: Boldness analysis
+            self._analyze_boldness(claim),
+            # Indicator 2: Consistency with history
+            self._analyze_consistency(claim, recent_claim_boldness),
+            # Indicator 3: Timing analysis
+            self._analyze_timing(recent_trust_change),
+            # Indicator 4: Player reputation
+            self._analyze_reputation(challenge_success_rate)
+        ])
         
-        # Indicator 3: Timing analysis
-        timing_score = self._analyze_timing(claim, move_history)
-        scores.append(timing_score * self.bluff_indicators['timing_suspicious'])
+        total_score = float(np.dot(self._w, scores))
+        
+        logger.debug("Bluff detection score: %.3f", total_score)
+        
+        return max(0.0, min(1.0, total_score))
+    
+    def _extract_stats(self, move_history: HistorySoA) -> Tuple[Optional[float],
+                                                               Optional[float],
+                                                               Optional[float]]:
+        """
+        Compute every history statistic the indicators need in one go:
+        mean boldness of claims in the last 10 moves, mean trust change
+        over the last 5 moves, and the overall challenge success rate.
+        None marks a statistic with no underlying data.
+        """
+        if not len(move_history):
+            return None, None, None
         
-        # Indicator 4: Player reputation
-        reputation_score = self._analyze_reputation(move_history)
-        scores.append(reputation_score * self.bluff_indicators['reputation_factor'])
+        # Short windows: plain Python means beat NumPy's per-call overhead
+        recent_claims = move_history.boldness[-10:][move_history.is_claim[-10:]].tolist()
+        recent_claim_boldness = (math.fsum(recent_claims) / len(recent_claims)
+                                 if recent_claims else None)
         
-        total_score = sum(scores)
+        recent_changes = move_history.trust_change[-5:].tolist()
+        recent_trust_change = math.fsum(recent_changes) / len(recent_changes)
         
-        logger.debug(f"Bluff detection score: {total_score:.3f}")
+        # Known bluffs are challenges that succeeded
+        challenge_success = move_history.success[move_history.is_challenge]
+        challenge_success_rate = (float(challenge_success.mean())
+                                  if len(challenge_success) else None)
         
-        return max(0.0, min(1.0, total_score))
+        return recent_claim_boldness, recent_trust_change, challenge_success_rate
     
     def _analyze_boldness(self, claim: Dict) -> float:
         """
@@ -61,85 +104,57 @@ class BluffDetector:
         """
         boldness = claim.get('boldness', 0.5)
         
-        # Exponential relationship: very bold = very suspicious
-        suspicion = (boldness ** 2)
+        # Quadratic relationship: very bold = very suspicious
+        suspicion = boldness * boldness
         
         return suspicion
     
-    def _analyze_consistency(self, claim: Dict, 
-                            move_history: List[Dict]) -> float:
+    def _analyze_consistency(self, claim: Dict,
+                            recent_claim_boldness: Optional[float]) -> float:
         """
         Check if claim is consistent with player's previous behavior.
         Inconsistent claims are more suspicious.
         """
-        if not move_history:
-            return 0.5  # No history, neutral
-        
-        recent_claims = [m for m in move_history[-10:] 
-                        if m.get('action') == 'CLAIM']
+        if recent_claim_boldness is None:
+            return 0.5  # No recent claims, neutral
         
-        if not recent_claims:
-            return 0.5
-        
-        # Analyze boldness pattern
+        # Large deviation from the recent boldness pattern = suspicious
         current_boldness = claim.get('boldness', 0.5)
-        avg_boldness = np.mean([c.get('boldness', 0.5) for c in recent_claims])
-        
-        # Large deviation = suspicious
-        deviation = abs(current_boldness - avg_boldness)
+        deviation = abs(current_boldness - recent_claim_boldness)
         
         inconsistency_score = min(1.0, deviation * 2)
         
         return inconsistency_score
     
-    def _analyze_timing(self, claim: Dict, move_history: List[Dict]) -> float:
+    def _analyze_timing(self, recent_trust_change: Optional[float]) -> float:
         """
         Analyze if timing of claim is suspicious.
         Desperate situations lead to more bluffs.
         """
-        if not move_history:
-            return 0.5
-        
-        # Check recent performance
-        recent_moves = move_history[-5:]
-        recent_trust_changes = [m.get('trust_change', 0) for m in recent_moves]
-        
-        if not recent_trust_changes:
+        if recent_trust_change is None:
             return 0.5
         
         # Losing streak = more likely to bluff
-        avg_recent = np.mean(recent_trust_changes)
-        
-        if avg_recent < -10:
+        if recent_trust_change < -10:
             # Bad streak, likely desperate
             return 0.75
-        elif avg_recent < 0:
+        elif recent_trust_change < 0:
             return 0.6
         else:
             return 0.4
     
-    def _analyze_reputation(self, move_history: List[Dict]) -> float:
+    def _analyze_reputation(self, challenge_success_rate: Optional[float]) -> float:
         """
         Players with history of bluffing are more likely to bluff again.
         """
-        if not move_history:
+        if challenge_success_rate is None:
             return 0.5
         
-        # Count known bluffs (challenges that succeeded)
-        challenges = [m for m in move_history 
-                     if m.get('action') == 'CHALLENGE']
-        
-        if not challenges:
-            return 0.5
-        
-        successful_challenges = sum(1 for c in challenges 
-                                   if c.get('success', False))
-        
-        bluff_rate = successful_challenges / len(challenges)
-        
-        return bluff_rate
+        return challenge_success_rate
     
     def update_indicators(self, weights: Dict[str, float]):
         """Update indicator weights based on performance"""
         self.bluff_indicators.update(weights)
+        self._w = self._weight_vector()
+        self.weights_version += 1
         logger.info(f"Updated bluff indicators: {self.bluff_indicators}")
\ No newline at end of file
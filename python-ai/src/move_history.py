@@ -0,0 +1,148 @@
+import math
+import numpy as np
+from collections import deque, namedtuple
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Mapping, Tuple, Union
+
+# Action codes stored in HistorySoA.action
+ACTION_OTHER = 0
+ACTION_CLAIM = 1
+ACTION_CHALLENGE = 2
+ACTION_ACCEPT = 3
+
+ACTION_CODES = {
+    'CLAIM': ACTION_CLAIM,
+    'CHALLENGE': ACTION_CHALLENGE,
+    'ACCEPT': ACTION_ACCEPT
+}
+
+# A normalized move record; defaults are those consumers assume for missing keys
+Move = namedtuple('Move', 'action boldness trust_change success is_bluff',
+                  defaults=(None, 0.5, 0, False, False))
+
+
+def move_from_dict(move: Mapping) -> Move:
+    """Normalize a move dict once, at ingress"""
+    return Move(
+        move.get('action'),
+        move.get('boldness', 0.5),
+        move.get('trust_change', 0),
+        move.get('success', False),
+        move.get('is_bluff', False)
+    )
+
+
+def normalize_moves(move_history: Iterable[Union[Move, Mapping]]) -> Tuple[Move, ...]:
+    """Convert move dicts to Move records; Moves pass through"""
+    return tuple(m if isinstance(m, Move) else move_from_dict(m) for m in move_history)
+
+
+@dataclass
+class HistorySoA:
+    """
+    Move history stored as parallel NumPy arrays (struct-of-arrays).
+    Lets feature extraction use slices and vectorized reductions
+    instead of walking a list of dicts on every decision. The action
+    masks are built once here and shared by every analysis.
+    """
+    trust_change: np.ndarray
+    boldness: np.ndarray
+    success: np.ndarray
+    action: np.ndarray
+    is_bluff: np.ndarray
+    is_claim: np.ndarray = field(init=False, repr=False)
+    is_challenge: np.ndarray = field(init=False, repr=False)
+    is_accept: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.is_claim = self.action == ACTION_CLAIM
+        self.is_challenge = self.action == ACTION_CHALLENGE
+        self.is_accept = self.action == ACTION_ACCEPT
+
+    @classmethod
+    def from_moves(cls, move_history: Iterable[Union[Move, Dict]]) -> 'HistorySoA':
+        """Convert Move records or move dicts (given the usual defaults)"""
+        moves = normalize_moves(move_history)
+        if not moves:
+            return cls(
+                trust_change=np.empty(0, dtype=np.float32),
+                boldness=np.empty(0, dtype=np.float64),
+                success=np.empty(0, dtype=np.bool_),
+                action=np.empty(0, dtype=np.uint8),
+                is_bluff=np.empty(0, dtype=np.bool_)
+            )
+
+        # Transpose the records into one tuple per field
+        actions, boldness, trust_change, success, is_bluff = zip(*moves)
+
+        return cls(
+            trust_change=np.array(trust_change, dtype=np.float32),
+            # float64: boldness deltas are compared against thresholds
+            # like 0.2, which float32 rounding can tip either way
+            boldness=np.array(boldness, dtype=np.float64),
+            success=np.array(success, dtype=np.bool_),
+            action=np.fromiter(
+                (ACTION_CODES.get(a, ACTION_OTHER) for a in actions),
+                dtype=np.uint8, count=len(actions)
+            ),
+            is_bluff=np.array(is_bluff, dtype=np.bool_)
+        )
+
+    def __len__(self) -> int:
+        return len(self.action)
+
+
+class RollingTrustStats:
+    """
+    Running trust-change statistics over the most recent outcomes,
+    maintained in O(1) per outcome from running sums. Momentum uses a
+    shorter trailing sub-window of the same values.
+    """
+
+    def __init__(self, window: int = 10, momentum_window: int = 5):
+        self._values = deque(maxlen=window)
+        self.momentum_window = momentum_window
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._recent_sum = 0.0
+
+    def push(self, trust_change: float):
+        """Add an outcome, dropping the oldest once the window is full"""
+        values = self._values
+
+        if len(values) >= self.momentum_window:
+            self._recent_sum -= values[-self.momentum_window]
+
+        if len(values) == values.maxlen:
+            oldest = values[0]
+            self._sum -= oldest
+            self._sum_sq -= oldest * oldest
+
+        values.append(trust_change)
+        self._sum += trust_change
+        self._sum_sq += trust_change * trust_change
+        self._recent_sum += trust_change
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def key(self) -> Tuple:
+        """Hashable snapshot of the window, for cache keys"""
+        return tuple(self._values)
+
+    def momentum(self) -> float:
+        """0.5 + mean trust change over the momentum window / 50"""
+        n = min(len(self._values), self.momentum_window)
+        if not n:
+            return 0.5
+
+        return 0.5 + (self._recent_sum / n) / 50.0
+
+    def volatility(self) -> float:
+        """Std of trust changes over the window / 20, capped at 1"""
+        n = len(self._values)
+        if n < 3:
+            return 0.5
+
+        variance = max(0.0, (self._sum_sq - self._sum * self._sum / n) / n)
+        return min(1.0, math.sqrt(variance) / 20.0)
@@ -1,10 +1,122 @@
+import math
 import numpy as np
-from typing import Dict, List
-from collections import defaultdict, deque
+from typing import Dict, List, Union
+from collections import defaultdict
+from functools import partial
 import logging
 
+import _fastmath
+from move_history import (HistorySoA, Move, ACTION_CODES, ACTION_OTHER, ACTION_CLAIM,
+                          ACTION_CHALLENGE, ACTION_ACCEPT, move_from_dict)
+
 logger = logging.getLogger(__name__)
 
+# Row layout of a player's buffered moves: only the fields the
+# pattern metrics read, ~14 bytes per move instead of a dict. Boldness
+# stays float64 to match the thresholds analyze_player_pattern applies
+PATTERN_DTYPE = np.dtype([
+    ('action', 'u1'),
+    ('bluff', '?'),
+    ('bold', 'f8'),
+    ('tc', 'f4')
+])
+
+
+class RollingPatternStats:
+    """
+    A player's most recent moves in a fixed-size NumPy ring buffer
+    (PATTERN_DTYPE rows), plus running pattern counters updated in O(1)
+    per move: each new move adds its contribution and the row it
+    overwrites has its contribution subtracted. Adaptability depends on
+    where the 5-move windows start, so it is recounted over the
+    buffered rows on demand.
+    """
+
+    def __init__(self, window: int = 20, risk_window: int = 10):
+        self.rows = np.zeros(window, dtype=PATTERN_DTYPE)
+        self.risk_window = min(risk_window, window)
+        self._head = 0
+        self._count = 0
+
+        self.claim_count = 0
+        self.bluff_count = 0
+        self.boldness_sum = 0.0
+        self.boldness_sq_sum = 0.0
+        self.challenge_count = 0
+        self.decision_count = 0
+        self.risk_sum = 0.0
+
+    def push(self, move: Move):
+        """Add a move, overwriting the oldest row once the buffer is full"""
+        rows = self.rows
+        window = len(rows)
+        head = self._head
+
+        # Retire contributions before the row is overwritten
+        if self._count == window:
+            self._apply(rows[head], -1)
+        if self._count >= self.risk_window:
+            self.risk_sum -= self._risk(rows[(head - self.risk_window) % window])
+
+        rows[head] = (
+            ACTION_CODES.get(move.action, ACTION_OTHER),
+            move.is_bluff,
+            move.boldness,
+            move.trust_change
+        )
+        row = rows[head]
+        self._apply(row, 1)
+        self.risk_sum += self._risk(row)
+
+        self._head = (head + 1) % window
+        self._count = min(self._count + 1, window)
+
+    def _apply(self, row, sign: int):
+        """Add (sign=1) or remove (sign=-1) a row's counter contributions"""
+        action = row['action']
+
+        if action == ACTION_CLAIM:
+            boldness = float(row['bold'])
+            self.claim_count += sign
+            self.boldness_sum += sign * boldness
+            self.boldness_sq_sum += sign * boldness * boldness
+            if row['bluff']:
+                self.bluff_count += sign
+        elif action == ACTION_CHALLENGE:
+            self.challenge_count += sign
+            self.decision_count += sign
+        elif action == ACTION_ACCEPT:
+            self.decision_count += sign
+
+    @staticmethod
+    def _risk(row) -> float:
+        """Risk score of a move: claim boldness, 0.7 to challenge, else 0.3"""
+        action = row['action']
+        if action == ACTION_CLAIM:
+            return float(row['bold'])
+        elif action == ACTION_CHALLENGE:
+            return 0.7
+        return 0.3
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def risk_count(self) -> int:
+        return min(self._count, self.risk_window)
+
+    def adaptation_count(self) -> int:
+        """Adaptations in the buffered rows' 5-move windows, oldest first"""
+        rows = self.rows[:self._count]
+        if self._count == len(self.rows):
+            rows = np.roll(rows, -self._head)
+
+        return _fastmath.adaptation_count(
+            np.ascontiguousarray(rows['tc']),
+            np.ascontiguousarray(rows['bold']),
+            rows['action'] == ACTION_CLAIM
+        )
+
 
 class PatternAnalyzer:
     """
@@ -14,29 +126,67 @@ class PatternAnalyzer:
 
     def __init__(self, history_window: int = 20):
         self.history_window = history_window
-        self.patterns = defaultdict(lambda: deque(maxlen=history_window))
+        # Per-player move buffers and running counters, created on first
+        # outcome by a C-level partial rather than a lambda
+        self.patterns: Dict[str, RollingPatternStats] = defaultdict(
+            partial(RollingPatternStats, history_window)
+        )
         self.tendencies = {}
 
-    def analyze_player_pattern(self, move_history: List[Dict]) -> Dict:
+    def analyze_player_pattern(self, move_history: Union[HistorySoA, List[Dict]]) -> Dict:
         """
-        Analyze complete pattern from move history.
+        Analyze complete pattern from move history, given as a list of
+        move dicts or an already-converted HistorySoA.
         Returns dictionary of identified patterns and tendencies.
         """
-        if not move_history:
+        if not len(move_history):
             return self._default_pattern()
 
-        pattern_data = {
-            'bluff_frequency': self._calculate_bluff_frequency(move_history),
-            'aggression_level': self._calculate_aggression(move_history),
-            'consistency': self._calculate_consistency(move_history),
-            'risk_preference': self._calculate_risk_preference(move_history),
-            'challenge_tendency': self._calculate_challenge_tendency(move_history),
-            'adaptability': self._calculate_adaptability(move_history)
-        }
+        if not isinstance(move_history, HistorySoA):
+            move_history = HistorySoA.from_moves(move_history)
+
+        return self._compute_pattern(move_history)
+
+    def _compute_pattern(self, history: HistorySoA) -> Dict:
+        """
+        Aggregate every metric's inputs from vectorized masks over the
+        history arrays; the adaptability scan runs as a compiled kernel.
+        """
+        is_claim = history.is_claim
+        claim_boldness = history.boldness[is_claim]
+        claim_count = len(claim_boldness)
+        challenge_count = int(np.count_nonzero(history.is_challenge))
+        decision_count = challenge_count + int(np.count_nonzero(history.is_accept))
+
+        boldness_sum = float(np.sum(claim_boldness))
+        boldness_sq_sum = float(np.dot(claim_boldness, claim_boldness))
 
-        logger.debug(f"Pattern analysis: {pattern_data}")
+        recent = slice(-10, None)
+        risk_scores = np.where(
+            is_claim[recent], history.boldness[recent],
+            np.where(history.is_challenge[recent], 0.7, 0.3)
+        )
 
-        return pattern_data
+        adaptations = _fastmath.adaptation_count(
+            history.trust_change, history.boldness, is_claim
+        )
+
+        return {
+            'bluff_frequency': self._calculate_bluff_frequency(
+                int(np.count_nonzero(history.is_bluff & is_claim)), claim_count
+            ),
+            'aggression_level': self._calculate_aggression(boldness_sum, claim_count),
+            'consistency': self._calculate_consistency(
+                len(history), boldness_sum, boldness_sq_sum, claim_count
+            ),
+            'risk_preference': float(risk_scores.mean()),
+            'challenge_tendency': self._calculate_challenge_tendency(
+                challenge_count, decision_count
+            ),
+            'adaptability': self._calculate_adaptability(
+                len(history), adaptations, len(history) // 5
+            )
+        }
 
     def _default_pattern(self) -> Dict:
         """Return neutral pattern for players with no history"""
@@ -49,118 +199,97 @@ class PatternAnalyzer:
             'adaptability': 0.5
         }
 
-    def _calculate_bluff_frequency(self, move_history: List[Dict]) -> float:
+    def _calculate_bluff_frequency(self, bluff_count: int, claim_count: int) -> float:
         """Calculate how often player bluffs"""
-        claims = [m for m in move_history if m.get('action') == 'CLAIM']
-
-        if not claims:
+        if not claim_count:
             return 0.5
 
-        bluffs = sum(1 for c in claims if c.get('is_bluff', False))
-
-        return bluffs / len(claims)
+        return bluff_count / claim_count
 
-    def _calculate_aggression(self, move_history: List[Dict]) -> float:
+    def _calculate_aggression(self, boldness_sum: float, claim_count: int) -> float:
         """Calculate player's aggression level based on boldness"""
-        claims = [m for m in move_history if m.get('action') == 'CLAIM']
-
-        if not claims:
+        if not claim_count:
             return 0.5
 
-        avg_boldness = np.mean([c.get('boldness', 0.5) for c in claims])
-
-        return float(avg_boldness)
+        return boldness_sum / claim_count
 
-    def _calculate_consistency(self, move_history: List[Dict]) -> float:
+    def _calculate_consistency(self, move_count: int, boldness_sum: float,
+                               boldness_sq_sum: float, claim_count: int) -> float:
         """Calculate how consistent player's strategy is"""
-        if len(move_history) < 5:
+        if move_count < 5 or not claim_count:
             return 0.5
 
-        claims = [m for m in move_history if m.get('action') == 'CLAIM']
-
-        if not claims:
-            return 0.5
-
-        boldness_values = [c.get('boldness', 0.5) for c in claims]
-
         # Lower standard deviation = more consistent
-        std_dev = np.std(boldness_values)
+        mean = boldness_sum / claim_count
+        variance = max(0.0, boldness_sq_sum / claim_count - mean * mean)
+        std_dev = math.sqrt(variance)
 
         # Convert to 0-1 scale (higher = more consistent)
         consistency = 1.0 - min(1.0, std_dev * 2)
 
-        return float(consistency)
-
-    def _calculate_risk_preference(self, move_history: List[Dict]) -> float:
-        """Calculate player's risk-taking tendency"""
-        recent_moves = move_history[-10:]
+        return consistency
 
-        if not recent_moves:
-            return 0.5
-
-        # High risk moves: high boldness claims, aggressive challenges
-        risk_scores = []
+    def get_player_pattern(self, player) -> Dict:
+        """
+        Pattern of a tracked player over their last history_window moves,
+        assembled from the running counters kept by update_patterns; only
+        adaptability rescans the buffer.
+        """
+        stats = self.patterns.get(player)
+        if not stats:
+            return self._default_pattern()
 
-        for move in recent_moves:
-            if move.get('action') == 'CLAIM':
-                risk_scores.append(move.get('boldness', 0.5))
-            elif move.get('action') == 'CHALLENGE':
-                risk_scores.append(0.7)  # Challenging is risky
-            else:
-                risk_scores.append(0.3)  # Accepting is safe
+        move_count = len(stats)
 
-        return float(np.mean(risk_scores)) if risk_scores else 0.5
+        return {
+            'bluff_frequency': self._calculate_bluff_frequency(
+                stats.bluff_count, stats.claim_count
+            ),
+            'aggression_level': self._calculate_aggression(
+                stats.boldness_sum, stats.claim_count
+            ),
+            'consistency': self._calculate_consistency(
+                move_count, stats.boldness_sum, stats.boldness_sq_sum, stats.claim_count
+            ),
+            'risk_preference': stats.risk_sum / stats.risk_count,
+            'challenge_tendency': self._calculate_challenge_tendency(
+                stats.challenge_count, stats.decision_count
+            ),
+            'adaptability': self._calculate_adaptability(
+                move_count, stats.adaptation_count(), move_count // 5
+            )
+        }
 
-    def _calculate_challenge_tendency(self, move_history: List[Dict]) -> float:
+    def _calculate_challenge_tendency(self, challenge_count: int,
+                                      decision_count: int) -> float:
         """Calculate how often player challenges vs accepts"""
-        decisions = [
-            m for m in move_history
-            if m.get('action') in ['CHALLENGE', 'ACCEPT']
-        ]
-
-        if not decisions:
+        if not decision_count:
             return 0.5
 
-        challenges = sum(1 for d in decisions if d.get('action') == 'CHALLENGE')
+        return challenge_count / decision_count
 
-        return challenges / len(decisions)
-
-    def _calculate_adaptability(self, move_history: List[Dict]) -> float:
+    def _calculate_adaptability(self, move_count: int, adaptations: int,
+                                windows: int) -> float:
         """
         Calculate how well player adapts strategy based on outcomes.
         Higher = changes strategy after losses.
         """
-        if len(move_history) < 10:
+        if move_count < 10:
             return 0.5
 
-        # Look for strategy changes after negative outcomes
-        adaptations = 0
-        windows = len(move_history) // 5
-
-        for i in range(windows):
-            start = i * 5
-            end = start + 5
-            window = move_history[start:end]
-
-            # Check if strategy changed after bad result
-            trust_changes = [m.get('trust_change', 0) for m in window]
-            boldness_changes = [
-                m.get('boldness', 0.5) for m in window
-                if m.get('action') == 'CLAIM'
-            ]
-
-            if trust_changes and boldness_changes:
-                if trust_changes[0] < 0 and len(boldness_changes) > 1:
-                    if abs(boldness_changes[0] - boldness_changes[-1]) > 0.2:
-                        adaptations += 1
-
         return min(1.0, adaptations / max(1, windows))
 
-    def predict_next_move(self, move_history: List[Dict], game_state: Dict) -> Dict:
+    def predict_next_move(self, move_history: List[Dict], game_state: Dict,
+                          player=None) -> Dict:
         """
-        Predict opponent's likely next move based on patterns.
+        Predict opponent's likely next move based on patterns. A player
+        tracked through update_patterns is read from their running
+        counters instead of rescanning move_history.
         """
-        pattern = self.analyze_player_pattern(move_history)
+        if player is not None and self.patterns.get(player):
+            pattern = self.get_player_pattern(player)
+        else:
+            pattern = self.analyze_player_pattern(move_history)
 
         phase = game_state.get('phase', 'CLAIM')
 
@@ -198,6 +327,6 @@ class PatternAnalyzer:
         """Update pattern tracking with new outcome"""
         player = outcome.get('player')
         if player:
-            self.patterns[player].append(outcome)
+            self.patterns[player].push(move_from_dict(outcome))
 
-        logger.debug(f"Updated patterns for player: {player}")
+        logger.debug("Updated patterns for player: %s", player)
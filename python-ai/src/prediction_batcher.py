@@ -0,0 +1,75 @@
+import asyncio
+import numpy as np
+import logging
+from typing import List, Optional, Tuple
+
+from strategy_model import StrategyModel
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionBatcher:
+    """
+    Coalesces success-probability requests that arrive within a short
+    window into one batched model call. Trades a couple of milliseconds
+    of latency for far fewer per-call model overheads under load.
+    """
+
+    def __init__(self, strategy_model: StrategyModel,
+                 window: float = 0.002, max_batch: int = 256):
+        self.strategy_model = strategy_model
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the background batching loop on the running event loop"""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Prediction batcher started (window: {self.window * 1000:.1f} ms)")
+
+    async def stop(self):
+        """Stop the batching loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def predict(self, features: np.ndarray) -> float:
+        """Queue a (1, n_features) row and wait for its success probability"""
+        future = asyncio.get_running_loop().create_future()
+        # Copy: the caller's buffer is reused before the batch runs
+        self._queue.put_nowait((features.copy(), future))
+        return await future
+
+    async def _run(self):
+        """Collect pending rows for one window, then predict them together"""
+        while True:
+            pending = [await self._queue.get()]
+            await asyncio.sleep(self.window)
+
+            while len(pending) < self.max_batch and not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+
+            self._predict_batch(pending)
+
+    def _predict_batch(self, pending: List[Tuple[np.ndarray, asyncio.Future]]):
+        """Run one model call for all pending rows and resolve their futures"""
+        try:
+            batch = np.vstack([features for features, _ in pending])
+            probabilities = self.strategy_model.predict_success_batch(batch)
+        except Exception as e:
+            logger.error(f"Batched prediction failed: {e}")
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), probability in zip(pending, probabilities):
+            # Requests may have been cancelled (client went away) meanwhile
+            if not future.done():
+                future.set_result(float(probability))
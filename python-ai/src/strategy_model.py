@@ -1,24 +1,81 @@
 import numpy as np
+import itertools
 import joblib
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
-from sklearn.preprocessing import StandardScaler
+from sklearn.base import clone
+from sklearn.ensemble import HistGradientBoostingClassifier, HistGradientBoostingRegressor
+from sklearn.inspection import permutation_importance
 from sklearn.model_selection import train_test_split
+from sklearn.exceptions import NotFittedError
+from sklearn.utils.validation import check_is_fitted
 import logging
 import os
+from typing import Iterable, Optional
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+# ONNX export is verified with the pinned scikit-learn/skl2onnx pair;
+# newer scikit-learn (bool tree fields) breaks the skl2onnx converter
+try:
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+except ImportError:
+    convert_sklearn = None
+
+# Saved models are compressed; lz4 decompresses fastest when installed
+try:
+    import lz4.frame  # noqa: F401
+    MODEL_COMPRESSION = ('lz4', 3)
+except ImportError:
+    MODEL_COMPRESSION = ('zlib', 3)
 
 logger = logging.getLogger(__name__)
 
 
+def _is_fitted(estimator) -> bool:
+    """Whether an estimator exists and has been fitted"""
+    if estimator is None:
+        return False
+    try:
+        check_is_fitted(estimator)
+        return True
+    except NotFittedError:
+        return False
+
+
 class StrategyModel:
     """
     Machine learning model for predicting move success probability
-    and optimal strategy selection.
+    and optimal strategy selection. Tree ensembles are invariant to
+    per-feature scaling, so features go to the models unscaled.
     """
     
+    # Feature columns, in the order the engine builds them
+    _FEATURE_NAMES = (
+        'round_progress', 'my_trust', 'opponent_trust',
+        'boldness', 'history_length', 'momentum', 'volatility'
+    )
+    N_FEATURES = len(_FEATURE_NAMES)
+    
+    # Features whose held-out permutation importance (accuracy drop)
+    # doesn't exceed this are dropped before the final fit
+    PRUNE_THRESHOLD = 0.01
+    
     def __init__(self, model_path: str = None, scaler_path: str = None):
         self.classifier = None
         self.regressor = None
-        self.scaler = StandardScaler()
+        self.feature_importances = None
+        self._cached_importance = None
+        self._ort = None
+        # Set once models are fitted (trained or loaded); predictions
+        # fall back to the heuristic / 0.0 until then
+        self._ready = False
+        self._value_ready = False
+        # Columns the models were fitted on (None = all) and the reused
+        # float32 row for single predictions
+        self._set_feature_idx(None)
         
         if model_path and os.path.exists(model_path):
             self.load_model(model_path, scaler_path)
@@ -28,53 +85,90 @@ class StrategyModel:
     
     def _initialize_models(self):
         """Initialize ML models with default parameters"""
-        self.classifier = RandomForestClassifier(
-            n_estimators=200,
+        # Histogram-based boosting: features binned to uint8 (max_bins=255),
+        # multi-threaded fit
+        self.classifier = HistGradientBoostingClassifier(
+            max_iter=200,
             max_depth=15,
-            min_samples_split=5,
-            random_state=42,
-            n_jobs=-1
+            max_bins=255,
+            learning_rate=0.1,
+            early_stopping=True,
+            validation_fraction=0.1,
+            random_state=42
         )
         
-        self.regressor = GradientBoostingRegressor(
-            n_estimators=150,
+        self.regressor = HistGradientBoostingRegressor(
+            max_iter=150,
             max_depth=10,
+            max_bins=255,
             learning_rate=0.1,
+            early_stopping=True,
+            validation_fraction=0.1,
             random_state=42
         )
         
+        self._ready = False
+        self._value_ready = False
+        self._set_feature_idx(None)
+        
         logger.info("Initialized new ML models")
     
+    def _set_feature_idx(self, feature_idx: Optional[np.ndarray]):
+        """Select the feature columns the models use, resizing the row buffer"""
+        self._feature_idx = feature_idx
+        n_features = self.N_FEATURES if feature_idx is None else len(feature_idx)
+        self._feat_buf = np.empty((1, n_features), dtype=np.float32)
+    
+    def _select(self, features: np.ndarray) -> np.ndarray:
+        """Keep only the feature columns the models were fitted on"""
+        if self._feature_idx is None:
+            return features
+        return features[:, self._feature_idx]
+    
     def predict_success(self, features: np.ndarray) -> float:
         """
         Predict probability of move success given current features.
         Returns value between 0 and 1.
         """
-        if self.classifier is None:
+        if not self._ready:
             # Fallback heuristic if no trained model
             return self._heuristic_prediction(features)
         
-        try:
-            scaled_features = self.scaler.transform(features)
-            proba = self.classifier.predict_proba(scaled_features)[0]
-            return float(proba[1]) if len(proba) > 1 else 0.5
-        except Exception as e:
-            logger.error(f"Prediction error: {e}")
-            return self._heuristic_prediction(features)
+        np.copyto(self._feat_buf, self._select(features.reshape(1, -1)))
+        proba = self._predict_proba(self._feat_buf)[0]
+        return float(proba[1]) if len(proba) > 1 else 0.5
+    
+    def predict_success_batch(self, features: np.ndarray) -> np.ndarray:
+        """
+        Predict success probabilities for a stacked (n, n_features)
+        feature matrix in a single model call. Returns a 1-D array.
+        """
+        if not self._ready:
+            return np.array([self._heuristic_prediction(row) for row in features])
+        
+        proba = self._predict_proba(self._select(features))
+        if proba.shape[1] > 1:
+            return proba[:, 1]
+        return np.full(len(features), 0.5)
+    
+    def _predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Class probabilities from the ONNX session if loaded, else sklearn"""
+        if self._ort is not None:
+            return self._ort.run(
+                ['probabilities'],
+                {'X': features.astype(np.float32, copy=False)}
+            )[0]
+        
+        return self.classifier.predict_proba(features)
     
     def predict_outcome_value(self, features: np.ndarray) -> float:
         """
         Predict expected value of a move (trust points gained/lost).
         """
-        if self.regressor is None:
+        if not self._value_ready:
             return 0.0
         
-        try:
-            scaled_features = self.scaler.transform(features)
-            return float(self.regressor.predict(scaled_features)[0])
-        except Exception as e:
-            logger.error(f"Value prediction error: {e}")
-            return 0.0
+        return float(self.regressor.predict(self._select(features.reshape(1, -1)))[0])
     
     def _heuristic_prediction(self, features: np.ndarray) -> float:
         """
@@ -107,7 +201,8 @@ class StrategyModel:
         return max(0.1, min(0.9, success_prob))
     
     def train(self, X_train: np.ndarray, y_train: np.ndarray,
-              values_train: np.ndarray = None):
+              values_train: np.ndarray = None,
+              prune_threshold: Optional[float] = PRUNE_THRESHOLD):
         """
         Train the models on historical game data.
         
@@ -115,51 +210,233 @@ class StrategyModel:
             X_train: Feature matrix
             y_train: Binary success labels
             values_train: Outcome values (optional)
+            prune_threshold: Drop features with held-out permutation
+                importance at or below this (None keeps all)
         """
         logger.info(f"Training models on {len(X_train)} samples...")
         
-        # Fit scaler
-        self.scaler.fit(X_train)
-        X_scaled = self.scaler.transform(X_train)
+        self._set_feature_idx(None)
+        
+        # Histogram boosting has no impurity-based importances. Measure
+        # permutation importance on a held-out slice: on the training
+        # rows the ensemble's overfit makes noise features look useful
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=0.2, random_state=42
+        )
+        self.classifier.fit(X_fit, y_fit)
         
-        # Train classifier
-        self.classifier.fit(X_scaled, y_train)
+        self._cached_importance = None
+        self.feature_importances = permutation_importance(
+            self.classifier, X_val, y_val,
+            n_repeats=5, max_samples=min(len(X_val), 10000), random_state=42
+        ).importances_mean
         
-        # Train regressor if values provided
-        if values_train is not None:
-            self.regressor.fit(X_scaled, values_train)
+        if prune_threshold is not None:
+            keep = self.feature_importances > prune_threshold
+            if keep.any() and not keep.all():
+                dropped = [name for name, k in zip(self._FEATURE_NAMES, keep) if not k]
+                logger.info(f"Pruning low-importance features {dropped}")
+                
+                self._set_feature_idx(np.flatnonzero(keep))
+                self.feature_importances = np.where(keep, self.feature_importances, 0.0)
+        
+        # Final fit on all the training rows
+        self._fit(self._select(X_train), y_train, values_train)
         
         # Calculate training metrics
-        train_score = self.classifier.score(X_scaled, y_train)
+        X_used = self._select(X_train)
+        train_score = self.classifier.score(X_used, y_train)
         logger.info(f"Classifier training accuracy: {train_score:.3f}")
         
         if values_train is not None:
-            reg_score = self.regressor.score(X_scaled, values_train)
+            reg_score = self.regressor.score(X_used, values_train)
             logger.info(f"Regressor training R²: {reg_score:.3f}")
     
-    def save_model(self, model_path: str, scaler_path: str):
-        """Save trained models to disk"""
+    def train_incremental(self, batches: Iterable[tuple], rounds_per_batch: int = 20):
+        """
+        Train on an iterable of (X, y, values) chunks, holding one chunk
+        in memory at a time. Each chunk grows both ensembles by
+        rounds_per_batch trees via warm_start, with early stopping off.
+        Each fit re-bins on its own chunk, so earlier trees see slightly
+        shifted bin edges; chunks should come from one distribution.
+        Importances are measured on the last chunk and nothing is pruned.
+        """
+        # Fail before touching the fitted models if there is nothing to train on
+        batches = iter(batches)
+        first = next(batches, None)
+        if first is None:
+            raise ValueError("train_incremental got no batches")
+        
+        self._set_feature_idx(None)
+        self._ort = None
+        
+        # Start from unfitted copies so warm_start begins at round zero
+        self.classifier = clone(self.classifier)
+        self.regressor = clone(self.regressor)
+        self._ready = self._value_ready = False
+        estimators = [self.classifier, self.regressor]
+        saved = [est.get_params() for est in estimators]
+        for est in estimators:
+            est.set_params(warm_start=True, early_stopping=False, max_iter=0)
+        
+        n_samples = 0
+        value_ready = False
+        try:
+            for X, y, values in itertools.chain([first], batches):
+                self.classifier.set_params(max_iter=self.classifier.max_iter + rounds_per_batch)
+                self.classifier.fit(X, y)
+                
+                if values is not None:
+                    self.regressor.set_params(max_iter=self.regressor.max_iter + rounds_per_batch)
+                    self.regressor.fit(X, values)
+                    value_ready = True
+                
+                n_samples += len(X)
+        finally:
+            for est, params in zip(estimators, saved):
+                est.set_params(**params)
+        
+        self._ready = True
+        self._value_ready = value_ready
+        
+        self._cached_importance = None
+        self.feature_importances = permutation_importance(
+            self.classifier, X, y,
+            n_repeats=5, max_samples=min(len(X), 2000), random_state=42
+        ).importances_mean
+        
+        logger.info(f"Trained on {n_samples} samples in chunks, "
+                    f"{self.classifier.n_iter_} boosting rounds")
+    
+    def _fit(self, X_train: np.ndarray, y_train: np.ndarray,
+             values_train: Optional[np.ndarray]):
+        """Fit the classifier, and the regressor if values are given"""
+        # Any loaded ONNX session was exported from the previous fit
+        self._ort = None
+        self.classifier.fit(X_train, y_train)
+        
+        if values_train is not None:
+            self.regressor.fit(X_train, values_train)
+        
+        self._ready = True
+        self._value_ready = values_train is not None
+    
+    def export_onnx(self, onnx_path: str):
+        """
+        Export the trained classifier to ONNX (requires skl2onnx). The
+        graph takes raw float32 features and outputs plain class
+        probabilities.
+        """
+        onnx_model = convert_sklearn(
+            self.classifier,
+            initial_types=[('X', FloatTensorType([None, self.classifier.n_features_in_]))],
+            options={id(self.classifier): {'zipmap': False}}
+        )
+        
+        with open(onnx_path, 'wb') as f:
+            f.write(onnx_model.SerializeToString())
+        
+        logger.info(f"Classifier exported to {onnx_path}")
+    
+    def load_onnx(self, onnx_path: str):
+        """
+        Serve classifier probabilities through an ONNX Runtime session.
+        Keeps the sklearn path if onnxruntime or the file is missing.
+        """
+        if onnxruntime is None:
+            logger.info("onnxruntime not installed, using sklearn for inference")
+            return
+        
+        if not onnx_path or not os.path.exists(onnx_path):
+            return
+        
+        try:
+            session = onnxruntime.InferenceSession(
+                onnx_path, providers=['CPUExecutionProvider']
+            )
+        except Exception as e:
+            logger.error(f"Failed to load ONNX classifier: {e}")
+            self._ort = None
+            return
+        
+        # A stale export from another model would fail or mispredict
+        n_inputs = session.get_inputs()[0].shape[-1]
+        if n_inputs != self.classifier.n_features_in_:
+            logger.warning(f"Ignoring {onnx_path}: expects {n_inputs} features, "
+                           f"classifier has {self.classifier.n_features_in_}")
+            self._ort = None
+            return
+        
+        self._ort = session
+        logger.info(f"ONNX classifier loaded from {onnx_path}")
+    
+    @staticmethod
+    def onnx_path_for(model_path: str) -> str:
+        """ONNX file saved alongside a model pickle"""
+        return os.path.splitext(model_path)[0] + '.onnx'
+    
+    def save_model(self, model_path: str):
+        """
+        Save trained models to disk, plus the classifier as ONNX next to
+        them when skl2onnx is installed
+        """
         os.makedirs(os.path.dirname(model_path), exist_ok=True)
         
         model_data = {
             'classifier': self.classifier,
-            'regressor': self.regressor
+            'regressor': self.regressor,
+            'feature_importances': self.feature_importances,
+            'feature_idx': self._feature_idx
         }
         
-        joblib.dump(model_data, model_path)
-        joblib.dump(self.scaler, scaler_path)
+        joblib.dump(model_data, model_path, compress=MODEL_COMPRESSION)
         
         logger.info(f"Models saved to {model_path}")
+        
+        # Never leave an export of a previous model next to this pickle
+        onnx_path = self.onnx_path_for(model_path)
+        if os.path.exists(onnx_path):
+            os.remove(onnx_path)
+        
+        if convert_sklearn is not None and self._ready:
+            try:
+                self.export_onnx(onnx_path)
+            except Exception as e:
+                # Converter errors embed every node attribute array
+                logger.warning(f"ONNX export failed, serving with sklearn: "
+                               f"{type(e).__name__}: {' '.join(str(e).split())[:200]}")
+                logger.debug("ONNX export error", exc_info=True)
+                if os.path.exists(onnx_path):
+                    os.remove(onnx_path)
     
-    def load_model(self, model_path: str, scaler_path: str):
-        """Load pre-trained models from disk"""
+    def load_model(self, model_path: str, scaler_path: str = None):
+        """
+        Load pre-trained models from disk. scaler_path is accepted for
+        older callers; models fitted on scaled features need retraining.
+        """
+        self._ort = None
         try:
             model_data = joblib.load(model_path)
             self.classifier = model_data['classifier']
             self.regressor = model_data.get('regressor')
+            self._set_feature_idx(model_data.get('feature_idx'))
+            self._cached_importance = None
+            self.feature_importances = model_data.get(
+                'feature_importances',
+                getattr(self.classifier, 'feature_importances_', None)
+            )
+            
+            # Checked once here so the predict paths need no validation
+            self._ready = _is_fitted(self.classifier)
+            self._value_ready = _is_fitted(self.regressor)
+            if not self._ready:
+                logger.warning(f"Classifier in {model_path} is not fitted, using heuristics")
+            else:
+                self.load_onnx(self.onnx_path_for(model_path))
             
             if scaler_path and os.path.exists(scaler_path):
-                self.scaler = joblib.load(scaler_path)
+                logger.warning(f"Ignoring scaler {scaler_path}: models now use unscaled "
+                               "features, retrain if these models were fitted on scaled ones")
             
             logger.info(f"Models loaded from {model_path}")
         except Exception as e:
@@ -167,15 +444,11 @@ class StrategyModel:
             self._initialize_models()
     
     def get_feature_importance(self) -> dict:
-        """Get feature importance from trained classifier"""
-        if self.classifier is None:
+        """Get feature importance from trained classifier (cached until retrained)"""
+        if self.feature_importances is None:
             return {}
         
-        feature_names = [
-            'round_progress', 'my_trust', 'opponent_trust', 
-            'boldness', 'history_length', 'momentum', 'volatility'
-        ]
-        
-        importances = self.classifier.feature_importances_
+        if self._cached_importance is None:
+            self._cached_importance = dict(zip(self._FEATURE_NAMES, self.feature_importances))
         
-        return dict(zip(feature_names, importances))
\ No newline at end of file
+        return self._cached_importance
\ No newline at end of file
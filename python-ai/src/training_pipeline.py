@@ -2,6 +2,7 @@ import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
+from joblib import Parallel, delayed, effective_n_jobs
 import logging
 import os
 
@@ -11,66 +12,117 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def generate_batch(seed, n_samples: int) -> tuple:
+    """
+    Draw one batch of synthetic samples. seed is anything
+    np.random.default_rng accepts, including a Generator to draw from.
+    Returns (features, success labels, outcome values).
+    """
+    rng = np.random.default_rng(seed)
+    
+    # Draw every column of random game state features at once
+    round_progress, boldness, momentum, volatility = rng.random((4, n_samples))
+    my_trust, opponent_trust = rng.uniform(-50, 100, (2, n_samples))
+    history_len = rng.integers(0, 50, n_samples)
+    
+    # Calculate success based on heuristics
+    trust_advantage = (my_trust - opponent_trust) / 150.0
+    risk_factor = boldness * 0.5
+    
+    success_prob = np.clip(
+        0.6 + trust_advantage * 0.3 - risk_factor + (momentum - 0.5) * 0.1, 0.0, 1.0
+    )
+    
+    y = (rng.random(n_samples) < success_prob).astype(np.int64)
+    
+    # Calculate value
+    v = np.where(y == 1, 10 + boldness * 30, -(15 + boldness * 35))
+    
+    X = np.column_stack([
+        round_progress, my_trust / 100.0, opponent_trust / 100.0,
+        boldness, history_len / 50.0, momentum, volatility
+    ])
+    
+    return X, y, v
+
+
 class TrainingPipeline:
     """
     Complete training pipeline for AI models.
     Generates synthetic training data and trains models.
     """
     
-    def __init__(self, output_dir: str = "models/"):
+    def __init__(self, output_dir: str = "models/", seed: int = 42):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
         
-    def generate_synthetic_data(self, n_samples: int = 10000) -> tuple:
+        # One seeded generator for every draw the pipeline makes
+        self.rng = np.random.default_rng(seed)
+        
+    def generate_synthetic_data(self, n_samples: int = 10000, n_jobs: int = 1) -> tuple:
         """
         Generate synthetic training data based on game mechanics.
+        
+        With n_jobs != 1 the samples are split into one batch per worker,
+        each drawn from an independent child seed in a joblib process.
+        Generation is vectorized, so this only pays off for millions of
+        samples.
         """
         logger.info(f"Generating {n_samples} synthetic training samples...")
         
-        features = []
-        labels = []
-        values = []
-        
-        for _ in range(n_samples):
-            # Generate random game state features
-            round_progress = np.random.random()
-            my_trust = np.random.uniform(-50, 100)
-            opponent_trust = np.random.uniform(-50, 100)
-            boldness = np.random.random()
-            history_len = np.random.randint(0, 50)
-            momentum = np.random.random()
-            volatility = np.random.random()
-            
-            # Calculate success based on heuristics
-            trust_advantage = (my_trust - opponent_trust) / 150.0
-            risk_factor = boldness * 0.5
-            
-            success_prob = 0.6 + trust_advantage * 0.3 - risk_factor + (momentum - 0.5) * 0.1
-            success_prob = max(0.0, min(1.0, success_prob))
+        if n_jobs == 1 or n_samples == 0:
+            X, y, v = generate_batch(self.rng, n_samples)
+        else:
+            n_batches = min(n_samples, effective_n_jobs(n_jobs))
+            sizes = np.full(n_batches, n_samples // n_batches)
+            sizes[:n_samples % n_batches] += 1
+            seeds = np.random.SeedSequence(self.rng.integers(2**63)).spawn(n_batches)
             
-            success = 1 if np.random.random() < success_prob else 0
-            
-            # Calculate value
-            if success:
-                value = 10 + boldness * 30
-            else:
-                value = -(15 + boldness * 35)
-            
-            features.append([
-                round_progress, my_trust / 100.0, opponent_trust / 100.0,
-                boldness, history_len / 50.0, momentum, volatility
-            ])
-            labels.append(success)
-            values.append(value)
-        
-        X = np.array(features)
-        y = np.array(labels)
-        v = np.array(values)
+            batches = Parallel(n_jobs=n_jobs)(
+                delayed(generate_batch)(seed, int(size)) for seed, size in zip(seeds, sizes)
+            )
+            X, y, v = (np.concatenate(parts) for parts in zip(*batches))
         
         logger.info(f"Generated {len(X)} samples with {np.mean(y):.2%} success rate")
         
         return X, y, v
     
+    def iter_synthetic_batches(self, n_samples: int, chunk_size: int = 10000):
+        """
+        Yield synthetic (X, y, v) chunks of at most chunk_size samples,
+        so only one chunk is ever held in memory.
+        """
+        for start in range(0, n_samples, chunk_size):
+            yield generate_batch(self.rng, min(chunk_size, n_samples - start))
+    
+    def train_models_streaming(self, n_samples: int, chunk_size: int = 10000):
+        """
+        Train on n_samples generated chunk by chunk, in O(chunk_size)
+        memory. Evaluated on one extra held-out chunk.
+        """
+        logger.info(f"Training models on {n_samples} samples in chunks of {chunk_size}...")
+        
+        model = StrategyModel()
+        model.train_incremental(self.iter_synthetic_batches(n_samples, chunk_size))
+        
+        # Evaluate
+        X_test, y_test, _ = generate_batch(self.rng, min(chunk_size, n_samples))
+        y_pred = (model.predict_success_batch(X_test) > 0.5).astype(int)
+        
+        accuracy = accuracy_score(y_test, y_pred)
+        logger.info(f"Test Accuracy: {accuracy:.3f}")
+        
+        print("\nClassification Report:")
+        print(classification_report(y_test, y_pred))
+        
+        # Save models
+        model_path = os.path.join(self.output_dir, "trained_model.pkl")
+        model.save_model(model_path)
+        
+        logger.info(f"Models saved to {self.output_dir}")
+        
+        return model
+    
     def train_models(self, X: np.ndarray, y: np.ndarray, v: np.ndarray):
         """Train classification and regression models"""
         logger.info("Training models...")
@@ -85,8 +137,8 @@ class TrainingPipeline:
         model.train(X_train, y_train, v_train)
         
         # Evaluate
-        y_pred_proba = [model.predict_success(x.reshape(1, -1)) for x in X_test]
-        y_pred = [1 if p > 0.5 else 0 for p in y_pred_proba]
+        y_pred_proba = model.predict_success_batch(X_test)
+        y_pred = (y_pred_proba > 0.5).astype(int)
         
         accuracy = accuracy_score(y_test, y_pred)
         logger.info(f"Test Accuracy: {accuracy:.3f}")
@@ -96,22 +148,27 @@ class TrainingPipeline:
         
         # Save models
         model_path = os.path.join(self.output_dir, "trained_model.pkl")
-        scaler_path = os.path.join(self.output_dir, "scaler.pkl")
-        model.save_model(model_path, scaler_path)
+        model.save_model(model_path)
         
         logger.info(f"Models saved to {self.output_dir}")
         
         return model
     
-    def run_full_pipeline(self, n_samples: int = 10000):
-        """Execute complete training pipeline"""
+    def run_full_pipeline(self, n_samples: int = 10000, chunk_size: int = None):
+        """
+        Execute complete training pipeline. With chunk_size set, data
+        is generated and trained on in chunks instead of all at once.
+        """
         logger.info("Starting full training pipeline...")
         
-        # Generate data
-        X, y, v = self.generate_synthetic_data(n_samples)
-        
-        # Train models
-        model = self.train_models(X, y, v)
+        if chunk_size:
+            model = self.train_models_streaming(n_samples, chunk_size)
+        else:
+            # Generate data
+            X, y, v = self.generate_synthetic_data(n_samples)
+            
+            # Train models
+            model = self.train_models(X, y, v)
         
         # Display feature importance
         importance = model.get_feature_importance()